@@ -4,25 +4,66 @@ Builds data files for the Vite frontend.
 Outputs:
 - web/public/data/episodes.json
 - web/public/data/coappearance_base.json
+- web/public/data/manifest.json
+  (episode shards, coappearance_base, centrality, presence)
+- web/public/data/chunks/ (content-hashed episode shards and data files)
 """
 from __future__ import annotations
 
+import argparse
+import base64
+import hashlib
 import json
 import math
+import os
 import re
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 import networkx as nx
 from scipy import sparse
+from scipy.sparse.linalg import ArpackNoConvergence, eigsh
+
+from presence_stats import CATEGORIES, character_stats, pack_presence, run_offsets
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT_DIR / "onepiece_episodes_json"
 OUT_DIR = ROOT_DIR / "web/public/data"
+CHUNK_DIR = OUT_DIR / "chunks"
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
+MANIFEST_VERSION = 1
+
+# Mirrors sagaDef in web/src/data/transform.js
+SAGA_DEF = {
+    "East Blue Saga": ["Romance Dawn", "Orange Town", "Syrup Village", "Baratie", "Arlong Park", "Loguetown"],
+    "Arabasta Saga": ["Reverse Mountain", "Whisky Peak", "Little Garden", "Drum Island", "Arabasta"],
+    "Sky Island Saga": ["Jaya", "Skypiea"],
+    "Water 7 Saga": ["Long Ring Long Land", "Water 7", "Enies Lobby", "Post-Enies Lobby"],
+    "Thriller Bark Saga": ["Thriller Bark"],
+    "Summit War Saga": ["Sabaody Archipelago", "Amazon Lily", "Impel Down", "Marineford", "Post-War"],
+    "Fish-Man Island Saga": ["Return to Sabaody", "Fish-Man Island"],
+    "Dressrosa Saga": ["Punk Hazard", "Dressrosa"],
+    "Whole Cake Island Saga": ["Zou", "Whole Cake Island", "Levely"],
+    "Wano Country Saga": ["Wano Country"],
+    "Final Saga": ["Egghead", "Elbaph"],
+}
+ARC_TO_SAGA = {arc: saga for saga, arcs in SAGA_DEF.items() for arc in arcs}
+
+MIN_EPS_NODE_DEFAULT = 3
+MIN_EDGE_CO_DEFAULT = 1
+EDGE_CAP = 5.0
+TOP_N_NODES = 1500
+
+# Matches checkpointStep in web/src/data/coappearance.js
+CHECKPOINT_STEP = 50
+CENTRALITY_METRICS = ("betweenness", "eigenvector", "degree")
+CENTRALITY_SAMPLES = 256
+CENTRALITY_SEED = 42
+
 
 def extract_category_names(categories, prefix):
     names = []
@@ -166,37 +207,127 @@ def load_all_episodes():
     return episodes_df
 
 
-def write_episodes_json(df):
-    episodes = []
+def none_if_na(value):
+    return value if pd.notna(value) else None
+
+
+def episode_records(df):
+    records = []
     for _, row in df.iterrows():
         airdate = row["airdate"]
-        episodes.append(
+        records.append(
             {
                 "episode_number": int(row["episode_number"]) if pd.notna(row["episode_number"]) else None,
                 "airdate": airdate.date().isoformat() if pd.notna(airdate) else None,
-                "arc_name": row.get("arc_name"),
-                "char_debut": row.get("char_debut"),
-                "tech_debut": row.get("tech_debut"),
+                "arc_name": none_if_na(row.get("arc_name")),
+                "char_debut": none_if_na(row.get("char_debut")),
+                "tech_debut": none_if_na(row.get("tech_debut")),
                 "characters_list": row.get("characters_list") or [],
-                "director": row.get("director"),
-                "writer": row.get("writer"),
-                "art_director": row.get("art_director"),
-                "animator": row.get("animator"),
+                "director": none_if_na(row.get("director")),
+                "writer": none_if_na(row.get("writer")),
+                "art_director": none_if_na(row.get("art_director")),
+                "animator": none_if_na(row.get("animator")),
             }
         )
+    return records
+
+
+def write_episodes_json(records):
     out_path = OUT_DIR / "episodes.json"
-    out_path.write_text(json.dumps(episodes, ensure_ascii=False), encoding="utf-8")
+    out_path.write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
     print(f"Wrote {out_path}")
 
 
-def build_coappearance_base(df):
-    min_eps_node_default = 3
-    min_edge_co_default = 1
-    edge_cap = 5.0
-    top_n_nodes = 1500
+def prune_chunk_dir(manifest):
+    """Delete chunks the (already written) manifest no longer references."""
+    listed = {entry["file"] for entry in manifest["shards"]}
+    listed.update(entry["file"] for entry in manifest["files"].values())
+    for fp in CHUNK_DIR.iterdir():
+        if fp.is_file() and fp.relative_to(OUT_DIR).as_posix() not in listed:
+            fp.unlink()
+            print(f"Removed {fp}")
+
+
+def write_hashed(stem, payload: bytes, suffix=".json"):
+    """Write payload under a content-addressed name and return its manifest entry."""
+    digest = hashlib.sha256(payload)
+    CHUNK_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = CHUNK_DIR / f"{stem}.{digest.hexdigest()[:12]}{suffix}"
+    out_path.write_bytes(payload)
+    print(f"Wrote {out_path}")
+    return {
+        "file": out_path.relative_to(OUT_DIR).as_posix(),
+        "bytes": len(payload),
+        # Subresource Integrity string, usable as fetch(..., { integrity }).
+        "integrity": "sha256-" + base64.b64encode(digest.digest()).decode("ascii"),
+    }
+
+
+def slugify(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
 
+
+def shard_episodes(records):
+    """Group episode records into contiguous saga runs.
+
+    Episodes whose arc is not in SAGA_DEF (fillers, missing arc) stay with the
+    saga they air in, so every shard covers one unbroken episode range.
+    """
+    numbered = sorted(
+        (r for r in records if r["episode_number"] is not None), key=lambda r: r["episode_number"]
+    )
+    shards = []
+    current = None
+    for rec in numbered:
+        saga = ARC_TO_SAGA.get(rec["arc_name"]) or (current["saga"] if current else "Unknown")
+        if current is None or saga != current["saga"]:
+            current = {"saga": saga, "arcs": [], "episodes": []}
+            shards.append(current)
+        current["episodes"].append(rec)
+        if isinstance(rec["arc_name"], str) and rec["arc_name"] not in current["arcs"]:
+            current["arcs"].append(rec["arc_name"])
+    return shards
+
+
+def write_episode_shards(records):
+    entries = []
+    for i, shard in enumerate(shard_episodes(records)):
+        shard_id = f"{i:02d}-{slugify(shard['saga'])}"
+        eps = shard["episodes"]
+        payload = json.dumps(eps, ensure_ascii=False, allow_nan=False).encode("utf-8")
+        entry = {
+            "id": shard_id,
+            "saga": shard["saga"],
+            "arcs": shard["arcs"],
+            "from_episode": eps[0]["episode_number"],
+            "to_episode": eps[-1]["episode_number"],
+            "episode_count": len(eps),
+        }
+        entry.update(write_hashed(f"episodes-{shard_id}", payload))
+        entries.append(entry)
+    return entries
+
+
+def write_manifest(shards, files):
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "episode_count": sum(s["episode_count"] for s in shards),
+        "shards": shards,
+        "files": files,
+    }
+    # Chunks are written before the manifest and pruned after it, and the
+    # manifest is swapped in atomically, so it never lists a missing file.
+    out_path = OUT_DIR / "manifest.json"
+    tmp_path = out_path.with_suffix(".json.tmp")
+    tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2, allow_nan=False), encoding="utf-8")
+    os.replace(tmp_path, out_path)
+    print(f"Wrote {out_path}")
+    return manifest
+
+
+def build_presence_matrix(df):
+    """Return (eps_sorted, all_chars, A) with A a sparse episodes x characters 0/1 matrix."""
     eps_sorted = df.dropna(subset=["episode_number"]).sort_values("episode_number")
-    ep_ids = eps_sorted["episode_number"].to_numpy()
     chars_series = eps_sorted["characters_list"].apply(lambda xs: xs or [])
     all_chars = sorted({c for lst in chars_series for c in lst})
     char_to_idx = {c: i for i, c in enumerate(all_chars)}
@@ -208,38 +339,50 @@ def build_coappearance_base(df):
             cols.append(char_to_idx[c])
             data.append(1)
     A = sparse.coo_matrix((data, (rows, cols)), shape=(len(eps_sorted), len(all_chars))).tocsr()
-
-    prefix_counts = np.zeros((len(ep_ids) + 1, A.shape[1]), dtype=np.int32)
-    prefix_counts[1:] = np.cumsum(A.toarray(), axis=0)
-    global_node_counts = prefix_counts[-1]
-
-    def build_graph_from_co(co_mat, node_counts, min_eps_node, min_edge_co, top_n=None):
-        if top_n:
-            top_idx = np.argsort(node_counts)[::-1][:top_n]
-            keep_nodes = set(top_idx[node_counts[top_idx] >= min_eps_node])
-        else:
-            keep_nodes = {i for i, c in enumerate(node_counts) if c >= min_eps_node}
-        co_mat = co_mat.tocoo()
-        edges = []
-        for i, j, w in zip(co_mat.row, co_mat.col, co_mat.data):
-            if i >= j:
-                continue
-            if i not in keep_nodes or j not in keep_nodes:
-                continue
-            if w < min_edge_co:
-                continue
-            logw = min(max(math.log1p(w), 1.0), edge_cap)
-            edges.append((i, j, logw, w))
-        G = nx.Graph()
-        for i in keep_nodes:
-            G.add_node(i, eps=int(node_counts[i]), size=math.log1p(node_counts[i]))
-        for i, j, logw, raw in edges:
-            G.add_edge(i, j, weight=logw, raw=int(raw))
-        return G
-
-    co_full = (A.T @ A).tocsr()
-    co_full.setdiag(0)
-    co_full.eliminate_zeros()
+    return eps_sorted, all_chars, A
+
+
+def co_matrix(A):
+    """Character x character co-appearance counts for the episodes in A."""
+    co = (A.T @ A).tocsr()
+    co.setdiag(0)
+    co.eliminate_zeros()
+    return co
+
+
+def build_graph_from_co(co_mat, node_counts, min_eps_node, min_edge_co, top_n=None):
+    if top_n:
+        top_idx = np.argsort(node_counts)[::-1][:top_n]
+        keep_nodes = set(top_idx[node_counts[top_idx] >= min_eps_node])
+    else:
+        keep_nodes = {i for i, c in enumerate(node_counts) if c >= min_eps_node}
+    co_mat = co_mat.tocoo()
+    edges = []
+    for i, j, w in zip(co_mat.row, co_mat.col, co_mat.data):
+        if i >= j:
+            continue
+        if i not in keep_nodes or j not in keep_nodes:
+            continue
+        if w < min_edge_co:
+            continue
+        logw = min(max(math.log1p(w), 1.0), EDGE_CAP)
+        edges.append((i, j, logw, w))
+    G = nx.Graph()
+    for i in keep_nodes:
+        G.add_node(i, eps=int(node_counts[i]), size=math.log1p(node_counts[i]))
+    for i, j, logw, raw in edges:
+        G.add_edge(i, j, weight=logw, raw=int(raw))
+    return G
+
+
+def build_coappearance_base(eps_sorted, all_chars, A):
+    min_eps_node_default = MIN_EPS_NODE_DEFAULT
+    min_edge_co_default = MIN_EDGE_CO_DEFAULT
+    top_n_nodes = TOP_N_NODES
+
+    global_node_counts = np.asarray(A.sum(axis=0)).ravel().astype(np.int32)
+
+    co_full = co_matrix(A)
 
     base_G = build_graph_from_co(
         co_full, global_node_counts, min_eps_node_default, min_edge_co_default, top_n=top_n_nodes
@@ -314,15 +457,213 @@ def build_coappearance_base(df):
         },
     }
 
+    payload = json.dumps(out, ensure_ascii=False).encode("utf-8")
     out_path = OUT_DIR / "coappearance_base.json"
-    out_path.write_text(json.dumps(out, ensure_ascii=False), encoding="utf-8")
+    out_path.write_bytes(payload)
     print(f"Wrote {out_path}")
+    return write_hashed("coappearance_base", payload)
+
 
+def checkpoint_ends(n_episodes, step=CHECKPOINT_STEP):
+    """Prefix lengths (in episodes) at which centrality is sampled."""
+    ends = list(range(step, n_episodes, step))
+    if n_episodes:
+        ends.append(n_episodes)
+    return ends
 
-def main():
+
+def eigenvector_from_co(co):
+    """Leading eigenvector of the weighted co-matrix, L2-normalised like networkx."""
+    out = np.zeros(co.shape[0])
+    active = np.flatnonzero(co.getnnz(axis=1))
+    if len(active) < 2:
+        return out
+    sub = co[active][:, active].astype(np.float64)
+    try:
+        _, vecs = eigsh(sub, k=1, which="LA")
+        vec = vecs[:, 0]
+    except ArpackNoConvergence:
+        _, vecs = np.linalg.eigh(sub.toarray())
+        vec = vecs[:, -1]
+    vec = np.abs(vec)
+    norm = np.linalg.norm(vec)
+    out[active] = vec / norm if norm else vec
+    return out
+
+
+def degree_from_co(co, node_counts):
+    """Distinct co-appearing characters over (active characters - 1)."""
+    n_active = int(np.count_nonzero(node_counts))
+    if n_active < 2:
+        return np.zeros(co.shape[0])
+    return co.getnnz(axis=1) / (n_active - 1)
+
+
+# Per-process state set by init_centrality_worker, so the presence matrix is
+# shipped to each worker once instead of pickling a co-matrix per task.
+CENTRALITY_WORKER = {}
+
+
+def init_centrality_worker(A, samples, seed):
+    CENTRALITY_WORKER.update(A=A, samples=samples, seed=seed)
+
+
+def checkpoint_centrality(end):
+    """Process-pool worker: (metrics, characters) centrality for episodes [0, end)."""
+    prefix = CENTRALITY_WORKER["A"][:end]
+    samples = CENTRALITY_WORKER["samples"]
+    seed = CENTRALITY_WORKER["seed"]
+    node_counts = np.asarray(prefix.sum(axis=0)).ravel().astype(np.int32)
+    co = co_matrix(prefix)
+    n_chars = co.shape[0]
+    betweenness = np.zeros(n_chars)
+    G = build_graph_from_co(co, node_counts, MIN_EPS_NODE_DEFAULT, MIN_EDGE_CO_DEFAULT, top_n=TOP_N_NODES)
+    n_nodes = G.number_of_nodes()
+    if n_nodes > 2:
+        # Sampled-pivot approximation; exact once the graph is smaller than the sample.
+        k = samples if samples and samples < n_nodes else None
+        for node, value in nx.betweenness_centrality(G, k=k, seed=seed).items():
+            betweenness[node] = value
+    return np.vstack(
+        [betweenness, eigenvector_from_co(co), degree_from_co(co, node_counts)]
+    ).astype(np.float32)
+
+
+def build_centrality(eps_sorted, all_chars, A, samples=CENTRALITY_SAMPLES, workers=None):
+    """Characters x checkpoints centrality arrays, one checkpoint per pool task.
+
+    Writes a float32 binary laid out as [metric][character][checkpoint] (row-major)
+    and a JSON sidecar describing the axes. Characters that score zero on every
+    metric at every checkpoint are dropped; `char_index` maps rows back to
+    `all_chars` in coappearance_base.json.
+    """
+    ep_ids = eps_sorted["episode_number"].to_numpy()
+    ends = checkpoint_ends(A.shape[0])
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_centrality_worker,
+        initargs=(A.tocsr(), samples, CENTRALITY_SEED),
+    ) as pool:
+        per_checkpoint = list(pool.map(checkpoint_centrality, ends))
+
+    if per_checkpoint:
+        values = np.stack(per_checkpoint, axis=-1)
+    else:
+        values = np.zeros((len(CENTRALITY_METRICS), len(all_chars), 0), dtype=np.float32)
+    char_index = np.flatnonzero(values.any(axis=(0, 2)))
+    values = np.ascontiguousarray(values[:, char_index, :], dtype="<f4")
+
+    meta = {
+        "metrics": list(CENTRALITY_METRICS),
+        "checkpoints": [int(ep_ids[end - 1]) for end in ends],
+        "char_index": char_index.tolist(),
+        "shape": list(values.shape),
+        "dtype": "float32",
+        "layout": "metric,character,checkpoint",
+        "params": {
+            "checkpoint_step": CHECKPOINT_STEP,
+            "betweenness_samples": samples,
+            "min_eps_node": MIN_EPS_NODE_DEFAULT,
+            "min_edge_co": MIN_EDGE_CO_DEFAULT,
+            "top_n_nodes": TOP_N_NODES,
+        },
+    }
+    return {
+        "centrality": write_hashed("centrality", values.tobytes(), suffix=".bin"),
+        "centrality_meta": write_hashed(
+            "centrality_meta", json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        ),
+    }
+
+
+def build_presence(eps_sorted, A):
+    """Bit-packed presence matrix plus vectorized per-character statistics.
+
+    Columns follow `all_chars` in coappearance_base.json. Writes the packed
+    episodes x characters bits, the run-length appearance intervals (start/end
+    episode-row pairs, character-major) and a JSON sidecar with the statistics.
+    """
+    P = A.toarray() > 0
+    n_episodes, n_chars = P.shape
+    ep_ids = eps_sorted["episode_number"].to_numpy().astype(np.int64)
+    arc_codes, arc_names = pd.factorize(eps_sorted["arc_name"])
+    stats = character_stats(P, ep_ids, arc_codes)
+
+    run_char, run_start, run_end = stats["runs"]
+    runs_dtype = "<u2" if n_episodes < 2**16 else "<u4"
+    runs = np.column_stack([run_start, run_end]).astype(runs_dtype)
+
+    meta = {
+        "shape": [n_episodes, n_chars],
+        "bitorder": "big",
+        "episodes": ep_ids.tolist(),
+        "arcs": [str(a) for a in arc_names],
+        "arc_codes": arc_codes.tolist(),
+        "runs_dtype": "uint16" if runs_dtype == "<u2" else "uint32",
+        "run_offsets": run_offsets(run_char, n_chars).tolist(),
+        "categories": list(CATEGORIES),
+        "stats": {
+            "debut_episode": stats["debut_episode"].tolist(),
+            "count": stats["count"].tolist(),
+            "coverage": np.round(stats["coverage"], 4).tolist(),
+            "arc_span": stats["arc_span"].tolist(),
+            "longest_absence": stats["longest_absence"].tolist(),
+            "category": stats["category"].tolist(),
+        },
+    }
+    return {
+        "presence": write_hashed("presence", pack_presence(P).tobytes(), suffix=".bin"),
+        "presence_runs": write_hashed("presence_runs", runs.tobytes(), suffix=".bin"),
+        "presence_meta": write_hashed(
+            "presence_meta", json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        ),
+    }
+
+
+def non_negative_int(text):
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be >= 0, got {value}")
+    return value
+
+
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be >= 1, got {value}")
+    return value
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build data files for the Vite frontend.")
+    parser.add_argument(
+        "--centrality-samples",
+        type=non_negative_int,
+        default=CENTRALITY_SAMPLES,
+        help="pivot nodes sampled for approximate betweenness (0 = exact)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        default=None,
+        help="process pool size for per-checkpoint centrality (default: CPU count)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     df = load_all_episodes()
-    write_episodes_json(df)
-    build_coappearance_base(df)
+    records = episode_records(df)
+    write_episodes_json(records)
+    shards = write_episode_shards(records)
+    eps_sorted, all_chars, A = build_presence_matrix(df)
+    files = {"coappearance_base": build_coappearance_base(eps_sorted, all_chars, A)}
+    files.update(build_presence(eps_sorted, A))
+    files.update(
+        build_centrality(eps_sorted, all_chars, A, samples=args.centrality_samples, workers=args.workers)
+    )
+    prune_chunk_dir(write_manifest(shards, files))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,116 @@
+"""
+Vectorized character presence statistics.
+
+Everything works on a boolean episodes x characters presence matrix P
+(rows in episode order), so per-character numbers come out of a handful of
+array ops instead of an exploded long table plus groupby/apply.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+CATEGORIES = ("Core", "Arc-only", "Recurring")
+CORE_COVERAGE = 0.50
+ARC_ONLY_SPAN = 3
+
+
+def presence_from_lists(char_lists, all_chars=None):
+    """Return (P, all_chars) from per-episode character lists."""
+    char_lists = [xs or [] for xs in char_lists]
+    if all_chars is None:
+        all_chars = sorted({c for xs in char_lists for c in xs})
+    char_to_idx = {c: i for i, c in enumerate(all_chars)}
+    rows = np.repeat(np.arange(len(char_lists)), [len(xs) for xs in char_lists])
+    cols = np.fromiter((char_to_idx[c] for xs in char_lists for c in xs), dtype=np.int64, count=len(rows))
+    P = np.zeros((len(char_lists), len(all_chars)), dtype=bool)
+    P[rows, cols] = True
+    return P, list(all_chars)
+
+
+def pack_presence(P):
+    """Bit-pack P along the character axis: (episodes, ceil(chars / 8)) uint8, MSB first."""
+    return np.packbits(P, axis=1)
+
+
+def unpack_presence(packed, n_chars):
+    return np.unpackbits(packed, axis=1, count=n_chars).astype(bool)
+
+
+def appearance_runs(P):
+    """Run-length appearance intervals, sorted by character then start.
+
+    Returns (run_char, run_start, run_end) with half-open [start, end) episode
+    row indices.
+    """
+    edges = np.diff(np.pad(P.astype(np.int8), ((1, 1), (0, 0))), axis=0).T
+    run_char, run_start = np.nonzero(edges == 1)
+    _, run_end = np.nonzero(edges == -1)
+    return run_char, run_start, run_end
+
+
+def run_offsets(run_char, n_chars):
+    """CSR-style offsets: runs of character i are [offsets[i], offsets[i + 1])."""
+    offsets = np.zeros(n_chars + 1, dtype=np.int64)
+    np.cumsum(np.bincount(run_char, minlength=n_chars), out=offsets[1:])
+    return offsets
+
+
+def longest_absence(run_char, run_start, run_end, n_episodes, n_chars):
+    """Longest stretch of missed episodes after debut, including the trailing gap."""
+    gaps = np.zeros(n_chars, dtype=np.int64)
+    if not len(run_char):
+        return gaps
+    same = run_char[1:] == run_char[:-1]
+    np.maximum.at(gaps, run_char[1:][same], (run_start[1:] - run_end[:-1])[same])
+    last = np.r_[~same, True]
+    np.maximum.at(gaps, run_char[last], n_episodes - run_end[last])
+    return gaps
+
+
+def classify(coverage, arc_span):
+    """Category codes indexing CATEGORIES."""
+    return np.select(
+        [coverage >= CORE_COVERAGE, arc_span == ARC_ONLY_SPAN], [0, 1], default=2
+    ).astype(np.int8)
+
+
+def character_stats(P, ep_ids, arc_codes):
+    """Per-character statistics for all columns of P at once.
+
+    arc_codes holds one integer per episode row (-1 for no arc), e.g. from
+    pd.factorize. Characters that never appear get debut_episode -1 and zeros.
+    """
+    n_episodes, n_chars = P.shape
+    ep_ids = np.asarray(ep_ids)
+    arc_codes = np.asarray(arc_codes)
+    appeared = P.any(axis=0)
+    count = P.sum(axis=0)
+    if n_episodes:
+        first_row = P.argmax(axis=0)
+        debut_idx = np.where(appeared, first_row, -1)
+        debut_episode = np.where(appeared, ep_ids[first_row], -1)
+        max_ep = ep_ids.max()
+    else:
+        debut_idx = np.full(n_chars, -1)
+        debut_episode = np.full(n_chars, -1)
+        max_ep = 0
+    span = np.where(appeared, max_ep - debut_episode + 1, 1)
+    coverage = count / span
+
+    n_arcs = int(arc_codes.max()) + 1 if n_episodes else 0
+    has_arc = arc_codes >= 0
+    arc_onehot = np.zeros((n_episodes, n_arcs), dtype=np.int32)
+    arc_onehot[np.flatnonzero(has_arc), arc_codes[has_arc]] = 1
+    arc_span = ((arc_onehot.T @ P.astype(np.int32)) > 0).sum(axis=0)
+
+    run_char, run_start, run_end = appearance_runs(P)
+    return {
+        "debut_index": debut_idx,
+        "debut_episode": debut_episode,
+        "count": count,
+        "coverage": coverage,
+        "arc_span": arc_span,
+        "longest_absence": longest_absence(run_char, run_start, run_end, n_episodes, n_chars),
+        "category": classify(coverage, arc_span),
+        "runs": (run_char, run_start, run_end),
+    }
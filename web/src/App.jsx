@@ -1,13 +1,15 @@
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useMemo, useRef, useState } from "react";
 import PlotlyChart from "./components/PlotlyChart.jsx";
 import UnifiedMetricChart from "./components/UnifiedMetricChart.jsx";
 import CrewCreditsChart from "./components/CrewCreditsChart.jsx";
 import TechniqueDebutsChart from "./components/TechniqueDebutsChart.jsx";
 import CharacterCommunityChart from "./components/CharacterCommunityChart.jsx";
+import CharacterPresenceChart from "./components/CharacterPresenceChart.jsx";
 import LegendPanel from "./components/LegendPanel.jsx";
-import { loadEpisodes, loadCoappearanceBase } from "./data/loadData.js";
+import { loadEpisodes, loadCoappearanceBase, loadPresence } from "./data/loadData.js";
 import {
   buildArcMeta,
+  buildCharacterPresence,
   buildCrewMetrics,
   buildTechniqueRunning,
   countItems,
@@ -24,7 +26,11 @@ import {
 export default function App() {
   const [episodes, setEpisodes] = useState(null);
   const [coBase, setCoBase] = useState(null);
+  const [presence, setPresence] = useState(null);
   const [error, setError] = useState(null);
+  const [loadNotice, setLoadNotice] = useState(null);
+  const [episodesComplete, setEpisodesComplete] = useState(false);
+  const episodeMaxTouched = useRef(false);
 
   const [coControls, setCoControls] = useState({
     minNode: 5,
@@ -36,16 +42,38 @@ export default function App() {
 
   useEffect(() => {
     let mounted = true;
-    Promise.all([loadEpisodes(), loadCoappearanceBase()])
+    const handleError = (err) => {
+      if (!mounted) return;
+      setError(err.message || "Failed to load data.");
+    };
+    // Shards covering the initial network view (episodes 1..episodeMax) render
+    // first; the rest stream in and episodeMax only moves once they have.
+    const episodesPromise = loadEpisodes({
+      fromEpisode: 1,
+      toEpisode: coControls.episodeMax,
+      onComplete: (allEpisodes) => {
+        if (!mounted) return;
+        setEpisodes(allEpisodes);
+        setEpisodesComplete(true);
+      },
+      // Keep what already rendered; only the background shards are missing.
+      onError: () => {
+        if (mounted) setLoadNotice("Some episodes failed to load; showing partial data.");
+      }
+    });
+    Promise.all([episodesPromise, loadCoappearanceBase()])
       .then(([episodesData, coBaseData]) => {
         if (!mounted) return;
-        setEpisodes(episodesData);
+        setEpisodes((prev) => prev || episodesData);
         setCoBase(coBaseData);
       })
-      .catch((err) => {
-        if (!mounted) return;
-        setError(err.message || "Failed to load data.");
-      });
+      .catch(handleError);
+    // Optional dataset: the presence raster is simply omitted if it is missing.
+    loadPresence()
+      .then((presenceData) => {
+        if (mounted) setPresence(presenceData);
+      })
+      .catch(() => {});
     return () => {
       mounted = false;
     };
@@ -60,13 +88,13 @@ export default function App() {
   }, [episodes]);
 
   useEffect(() => {
-    if (!episodesSorted.length) return;
+    if (!episodesComplete || !episodesSorted.length || episodeMaxTouched.current) return;
     const maxEp = episodesSorted[episodesSorted.length - 1].episode_number;
     setCoControls((prev) => ({
       ...prev,
       episodeMax: maxEp
     }));
-  }, [episodesSorted.length]);
+  }, [episodesComplete, episodesSorted.length]);
 
   const analyticsData = useMemo(() => {
     if (!episodesSorted.length) return [];
@@ -203,6 +231,11 @@ export default function App() {
     };
   }, [episodesSorted, coBase]);
 
+  const characterPresence = useMemo(() => {
+    if (!presence || !coBase?.all_chars) return null;
+    return buildCharacterPresence(presence, coBase.all_chars);
+  }, [presence, coBase]);
+
   const arcOrder = useMemo(() => {
     const map = new Map();
     arcMeta.forEach((arc, idx) => {
@@ -291,6 +324,10 @@ export default function App() {
               {stat}
             </span>
           ))}
+          {loadNotice && <span className="pill">{loadNotice}</span>}
+          {!loadNotice && !episodesComplete && (
+            <span className="pill">Loading remaining episodes…</span>
+          )}
         </div>
       </section>
       {sagaLegend.length > 0 && <LegendPanel legendData={sagaLegend} />}
@@ -342,6 +379,18 @@ export default function App() {
         )}
       </section>
 
+      <section className="section">
+        <div className="section-header">
+          <h2 className="section-title">Who keeps showing up, and who stays in their arc?</h2>
+          <p className="section-desc">
+            Each row is a character with 20+ appearances, ordered by debut. Core characters appear in at least half the episodes since their debut.
+          </p>
+        </div>
+        {characterPresence && (
+          <CharacterPresenceChart data={characterPresence} arcs={arcMeta} />
+        )}
+      </section>
+
       <section className="section">
         <div className="section-header">
           <h2 className="section-title">A network visualizing characters and how often they are featured together</h2>
@@ -359,12 +408,13 @@ export default function App() {
                 max={maxEp}
                 step={10}
                 value={coControls.episodeMax}
-                onChange={(event) =>
+                onChange={(event) => {
+                  episodeMaxTouched.current = true;
                   setCoControls((prev) => ({
                     ...prev,
                     episodeMax: Number(event.target.value)
-                  }))
-                }
+                  }));
+                }}
               />
             </div>
             <div className="control">
@@ -0,0 +1,104 @@
+import { useMemo } from "react";
+import PlotlyChart from "./PlotlyChart.jsx";
+
+const categoryColors = {
+  Core: "#560244",
+  "Arc-only": "#fd81bd",
+  Recurring: "#8a0963"
+};
+
+export default function CharacterPresenceChart({ data, arcs }) {
+  const { plotData, layout, height, xClamp } = useMemo(() => {
+    if (!data?.characters?.length) {
+      return { plotData: [], layout: { title: "" }, height: 520, xClamp: null };
+    }
+    const { characters, categories } = data;
+
+    // One trace per category; each appearance run is a single line segment.
+    const traces = categories.map((category) => ({
+      x: [],
+      y: [],
+      customdata: [],
+      mode: "lines",
+      name: category,
+      line: { color: categoryColors[category] || "#888888", width: 3 },
+      showlegend: true
+    }));
+    const traceByCategory = new Map(categories.map((category, idx) => [category, traces[idx]]));
+
+    let minEp = Infinity;
+    let maxEp = -Infinity;
+    characters.forEach((char, row) => {
+      const trace = traceByCategory.get(char.category);
+      if (!trace) return;
+      char.intervals.forEach(([from, to]) => {
+        const info = [char.name, char.category, from, to, char.count];
+        trace.x.push(from - 0.5, to + 0.5, null);
+        trace.y.push(row, row, null);
+        trace.customdata.push(info, info, null);
+        if (from < minEp) minEp = from;
+        if (to > maxEp) maxEp = to;
+      });
+    });
+
+    const shapes = (arcs || []).map((arc) => ({
+      type: "rect",
+      xref: "x",
+      yref: "paper",
+      x0: arc.fromEpisode,
+      x1: arc.toEpisode,
+      y0: 0,
+      y1: 1,
+      fillcolor: arc.arcColor,
+      opacity: 0.25,
+      line: { width: 0 },
+      layer: "below"
+    }));
+
+    return {
+      plotData: traces,
+      layout: {
+        title: "Character presence by episode",
+        xaxis: { title: "Episode number", range: [minEp - 0.5, maxEp + 0.5] },
+        yaxis: {
+          title: "Character (by debut)",
+          autorange: "reversed",
+          tickvals: characters.map((_, row) => row),
+          ticktext: characters.map((char) => char.name),
+          tickfont: { size: 8 },
+          fixedrange: true
+        },
+        margin: { l: 140, r: 30, t: 50, b: 60 },
+        shapes,
+        showlegend: true,
+        legend: { orientation: "h", y: 1.02, yanchor: "bottom" },
+        dragmode: "pan"
+      },
+      height: Math.max(520, characters.length * 9),
+      xClamp: { min: minEp - 0.5, max: maxEp + 0.5 }
+    };
+  }, [data, arcs]);
+
+  const tooltipFormatter = (point) => {
+    const custom = point.customdata;
+    if (!custom) return null;
+    const [name, category, from, to, count] = custom;
+    return [
+      `<strong>${name}</strong>`,
+      `<div>${category} · ${count} episodes</div>`,
+      `<div>${from === to ? `Episode ${from}` : `Episodes ${from}–${to}`}</div>`
+    ].join("");
+  };
+
+  return (
+    <section className="metric-container">
+      <PlotlyChart
+        data={plotData}
+        layout={layout}
+        height={height}
+        xClamp={xClamp}
+        tooltipFormatter={tooltipFormatter}
+      />
+    </section>
+  );
+}
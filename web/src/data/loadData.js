@@ -1,15 +1,112 @@
-export async function loadEpisodes() {
-  const res = await fetch("/data/episodes.json");
+const DATA_ROOT = "/data";
+
+let manifestPromise = null;
+
+export function loadManifest() {
+  if (!manifestPromise) {
+    manifestPromise = fetch(`${DATA_ROOT}/manifest.json`, { cache: "no-cache" })
+      .then((res) => (res.ok ? res.json() : null))
+      .catch(() => null);
+  }
+  return manifestPromise;
+}
+
+export function shardsForRange(manifest, fromEpisode, toEpisode) {
+  const from = Number.isFinite(fromEpisode) ? fromEpisode : -Infinity;
+  const to = Number.isFinite(toEpisode) ? toEpisode : Infinity;
+  return (manifest?.shards || []).filter(
+    (shard) => shard.to_episode >= from && shard.from_episode <= to
+  );
+}
+
+async function fetchShard(shard) {
+  const res = await fetch(`${DATA_ROOT}/${shard.file}`, { integrity: shard.integrity });
+  if (!res.ok) {
+    throw new Error(`${shard.file} not found. Run scripts/build_web_data.py.`);
+  }
+  return res.json();
+}
+
+export async function loadEpisodeShards(shards) {
+  const parts = await Promise.all(shards.map(fetchShard));
+  return parts.flat();
+}
+
+async function loadEpisodesLegacy() {
+  const res = await fetch(`${DATA_ROOT}/episodes.json`);
   if (!res.ok) {
     throw new Error("episodes.json not found. Run scripts/build_web_data.py.");
   }
   return res.json();
 }
 
+// Resolves with the shards covering [fromEpisode, toEpisode] first. When
+// onComplete is given, the remaining shards are fetched in the background and
+// onComplete receives the full episode list (also when everything was loaded
+// up front); otherwise everything is awaited.
+export async function loadEpisodes({ fromEpisode, toEpisode, onComplete, onError } = {}) {
+  const manifest = await loadManifest();
+  const priority = shardsForRange(manifest, fromEpisode, toEpisode);
+  if (
+    !manifest?.shards?.length ||
+    !onComplete ||
+    !priority.length ||
+    priority.length === manifest.shards.length
+  ) {
+    const all = manifest?.shards?.length
+      ? await loadEpisodeShards(manifest.shards)
+      : await loadEpisodesLegacy();
+    if (onComplete) onComplete(all);
+    return all;
+  }
+
+  const priorityIds = new Set(priority.map((shard) => shard.id));
+  const rest = manifest.shards.filter((shard) => !priorityIds.has(shard.id));
+  const loaded = new Map();
+  const parts = await Promise.all(priority.map(fetchShard));
+  priority.forEach((shard, i) => loaded.set(shard.id, parts[i]));
+
+  Promise.all(rest.map(fetchShard))
+    .then((restParts) => {
+      rest.forEach((shard, i) => loaded.set(shard.id, restParts[i]));
+      onComplete(manifest.shards.flatMap((shard) => loaded.get(shard.id)));
+    })
+    .catch((err) => {
+      if (onError) onError(err);
+    });
+
+  return parts.flat();
+}
+
 export async function loadCoappearanceBase() {
-  const res = await fetch("/data/coappearance_base.json");
+  const manifest = await loadManifest();
+  const file = manifest?.files?.coappearance_base?.file || "coappearance_base.json";
+  const res = await fetch(`${DATA_ROOT}/${file}`);
   if (!res.ok) {
     return null;
   }
   return res.json();
 }
+
+// Per-character presence stats and run-length appearance intervals (columns
+// follow all_chars). The bit-packed matrix itself (files.presence) is only
+// needed for random access, so it is not fetched here.
+export async function loadPresence() {
+  const manifest = await loadManifest();
+  const runsEntry = manifest?.files?.presence_runs;
+  const metaEntry = manifest?.files?.presence_meta;
+  if (!runsEntry || !metaEntry) {
+    return null;
+  }
+  const [metaRes, runsRes] = await Promise.all([
+    fetch(`${DATA_ROOT}/${metaEntry.file}`),
+    fetch(`${DATA_ROOT}/${runsEntry.file}`)
+  ]);
+  if (!metaRes.ok || !runsRes.ok) {
+    return null;
+  }
+  const meta = await metaRes.json();
+  const runsBuffer = await runsRes.arrayBuffer();
+  const runs = meta.runs_dtype === "uint32" ? new Uint32Array(runsBuffer) : new Uint16Array(runsBuffer);
+  return { ...meta, runs };
+}
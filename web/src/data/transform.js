@@ -462,71 +462,29 @@ export function buildCrewMetrics(episodes) {
   return { roles, series };
 }
 
-export function buildCharacterPresence(episodes, minCount = 20) {
-  const appearFull = [];
-  episodes.forEach((ep) => {
-    if (!Number.isInteger(ep.episode_number)) return;
-    (ep.characters_list || []).forEach((character) => {
-      if (!character) return;
-      appearFull.push({
-        episode_number: ep.episode_number,
-        arc_name: ep.arc_name,
-        character
-      });
-    });
-  });
-
-  const counts = new Map();
-  appearFull.forEach((row) => {
-    counts.set(row.character, (counts.get(row.character) || 0) + 1);
-  });
-  const keep = new Set(
-    Array.from(counts.entries())
-      .filter(([, count]) => count >= minCount)
-      .map(([name]) => name)
-  );
-
-  const appear = appearFull.filter((row) => keep.has(row.character));
-  const debutMap = new Map();
-  appear.forEach((row) => {
-    if (!debutMap.has(row.character)) {
-      debutMap.set(row.character, row.episode_number);
-    } else if (row.episode_number < debutMap.get(row.character)) {
-      debutMap.set(row.character, row.episode_number);
-    }
-  });
-
-  const maxEp = Math.max(...episodes.map((ep) => ep.episode_number || 0));
-
-  const appearanceCounts = new Map();
-  const arcCounts = new Map();
-  appear.forEach((row) => {
-    const key = row.character;
-    appearanceCounts.set(key, (appearanceCounts.get(key) || new Set()).add(row.episode_number));
-    if (!arcCounts.has(key)) arcCounts.set(key, new Set());
-    if (row.arc_name) arcCounts.get(key).add(row.arc_name);
-  });
-
-  const categoryMap = new Map();
-  Array.from(keep).forEach((char) => {
-    const debutEp = debutMap.get(char) || 0;
-    const appearanceSet = appearanceCounts.get(char) || new Set();
-    const coverage = appearanceSet.size / (maxEp - debutEp + 1 || 1);
-    const arcSpan = (arcCounts.get(char) || new Set()).size;
-    if (coverage >= 0.5) {
-      categoryMap.set(char, "Core");
-    } else if (arcSpan === 3) {
-      categoryMap.set(char, "Arc-only");
-    } else {
-      categoryMap.set(char, "Recurring");
+// Per-character appearance intervals straight from the run-length export, so
+// the raster draws one segment per run instead of one point per episode.
+export function buildCharacterPresence(presence, allChars, minCount = 20) {
+  const { episodes, run_offsets: runOffsets, runs, stats, categories } = presence;
+
+  const characters = [];
+  stats.count.forEach((count, charIdx) => {
+    if (count < minCount) return;
+    const intervals = [];
+    for (let r = runOffsets[charIdx]; r < runOffsets[charIdx + 1]; r += 1) {
+      intervals.push([episodes[runs[2 * r]], episodes[runs[2 * r + 1] - 1]]);
     }
+    characters.push({
+      name: allChars[charIdx],
+      category: categories[stats.category[charIdx]],
+      debutEpisode: stats.debut_episode[charIdx],
+      count,
+      intervals
+    });
   });
+  characters.sort((a, b) => a.debutEpisode - b.debutEpisode);
 
-  const characterOrder = Array.from(debutMap.entries())
-    .sort((a, b) => a[1] - b[1])
-    .map(([char]) => char);
-
-  return { appear, characterOrder, categoryMap };
+  return { categories, characters };
 }
 
 export function buildCoappearanceInputs(episodes, allCharsOverride) {